@@ -4,11 +4,38 @@ Test suite for Weather App
 """
 
 import json
+import os
+import subprocess
+import sys
 
 import pytest
+import requests
 
+import weather_web_app_enhanced
 from weather_web_app_enhanced import app
 
+# Cold start budgets (seconds), measured in a fresh interpreter: import
+# takes about 0.12 s and the first page 0.01-0.03 s, so these leave ~2.5x
+# headroom for slower CI machines
+IMPORT_BUDGET = 0.3
+FIRST_RESPONSE_BUDGET = 0.05
+
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import weather_web_app_enhanced as m
+imported = time.perf_counter()
+response = m.app.test_client().get("/")
+responded = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "first_response": responded - imported,
+    "status": response.status_code,
+    "requests_loaded": "requests" in sys.modules,
+    "numpy_loaded": "numpy" in sys.modules,
+}))
+"""
+
 
 @pytest.fixture
 def client():
@@ -18,6 +45,21 @@ def client():
         yield client
 
 
+@pytest.fixture
+def fresh_upstream(monkeypatch):
+    """Reset the circuit breaker so earlier upstream failures do not leak."""
+    monkeypatch.setattr(
+        weather_web_app_enhanced,
+        "_upstream_state",
+        {
+            "consecutive_failures": 0,
+            "open_until": 0.0,
+            "last_success": None,
+            "last_failure": None,
+        },
+    )
+
+
 def test_homepage(client):
     """Test that the homepage loads successfully."""
     response = client.get("/")
@@ -25,6 +67,46 @@ def test_homepage(client):
     assert b"Weather App" in response.data
 
 
+def test_homepage_embeds_initial_weather(client, monkeypatch):
+    """Test that the default city is embedded without an upstream call."""
+
+    def unexpected_get(*args, **kwargs):
+        raise AssertionError("homepage must not call the upstream API")
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "demo_key")
+    monkeypatch.setattr(requests, "get", unexpected_get)
+    response = client.get("/")
+    assert response.status_code == 200
+    assert b"const initialWeather = {" in response.data
+    assert b'"city": "London"' in response.data
+
+
+def test_homepage_real_api_skips_demo_fallback(client, monkeypatch):
+    """Test that real-API mode embeds only cached real observations."""
+
+    def unexpected_get(*args, **kwargs):
+        raise AssertionError("homepage must not call the upstream API")
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "test_key")
+    monkeypatch.setattr(weather_web_app_enhanced, "_observation_cache", {})
+    monkeypatch.setattr(requests, "get", unexpected_get)
+    response = client.get("/")
+    assert b"const initialWeather = null;" in response.data
+
+    demo = weather_web_app_enhanced.DEMO_DATA["london,gb"]
+    real = weather_web_app_enhanced.Observation(
+        dict(demo, main=dict(demo["main"], temp=3)), "GB", "GB"
+    )
+    # Cached a while ago: clients may only reuse it for what is left
+    real.expires_at = weather_web_app_enhanced.time.time() + 100
+    weather_web_app_enhanced._cache_store(
+        weather_web_app_enhanced._observation_cache, "london,gb", real
+    )
+    response = client.get("/")
+    assert b'"temperature": 3' in response.data
+    assert b'"max_age": 99' in response.data or b'"max_age": 100' in response.data
+
+
 def test_api_weather_missing_city(client):
     """Test API endpoint without city parameter."""
     response = client.get("/api/weather")
@@ -46,6 +128,80 @@ def test_api_weather_with_country(client):
     assert response.status_code in [200, 404]
 
 
+def test_api_weather_demo_payload(client, monkeypatch):
+    """Test that the pre-encoded demo payload matches the normalized fields."""
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "demo_key")
+    response = client.get("/api/weather?city=Paris&country=FR")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    data = json.loads(response.data)
+    expected = weather_web_app_enhanced.DEMO_OBSERVATIONS["paris,fr"].to_dict()
+    expected["timestamp"] = data["timestamp"]
+    assert data == expected
+    assert data["temperature"] == 20
+    assert data["visibility"] == 15.0
+    assert data["icon"] == "⛅"
+    # Every variant of a demo city is encoded at import
+    encoded = weather_web_app_enhanced.DEMO_OBSERVATIONS["paris,fr"]._encoded
+    assert ("imperial", "fr") in encoded
+
+
+def test_api_weather_unit_and_language_variants(client, monkeypatch, fresh_upstream):
+    """Test that variants are derived locally from one upstream fetch."""
+    calls = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return {
+                "name": "Lyon",
+                "sys": {"country": "FR"},
+                "weather": [
+                    {"main": "Rain", "description": "light rain", "icon": "10d"}
+                ],
+                "main": {"temp": 10, "feels_like": 8, "humidity": 90, "pressure": 1005},
+                "wind": {"speed": 5.0},
+                "visibility": 8000,
+            }
+
+    def fake_get(*args, **kwargs):
+        calls.append(kwargs["params"])
+        return FakeResponse()
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "test_key")
+    monkeypatch.setattr(weather_web_app_enhanced, "_observation_cache", {})
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    metric = json.loads(client.get("/api/weather?city=Lyon&country=FR").data)
+    imperial = json.loads(
+        client.get("/api/weather?city=Lyon&country=FR&units=imperial&lang=fr").data
+    )
+    standard = json.loads(
+        client.get("/api/weather?city=Lyon&country=FR&units=standard&lang=de").data
+    )
+
+    assert len(calls) == 1
+    assert calls[0]["units"] == "metric"
+    assert 0 < imperial["max_age"] <= weather_web_app_enhanced.CACHE_TTL
+    assert (metric["temperature"], metric["temperature_unit"]) == (10, "°C")
+    assert metric["description"] == "light rain"
+    assert (imperial["temperature"], imperial["temperature_unit"]) == (50, "°F")
+    assert (imperial["wind_speed"], imperial["wind_speed_unit"]) == (11.2, "mph")
+    assert (imperial["visibility"], imperial["visibility_unit"]) == (5.0, "mi")
+    assert imperial["description"] == "pluie"
+    assert (standard["temperature"], standard["temperature_unit"]) == (283, "K")
+    assert standard["description"] == "Regen"
+
+
+def test_api_weather_invalid_variant(client):
+    """Test that unsupported units or languages are rejected."""
+    response = client.get("/api/weather?city=London&units=furlongs")
+    assert response.status_code == 400
+    response = client.get("/api/weather?city=London&lang=xx")
+    assert response.status_code == 400
+
+
 def test_api_weather_invalid_city(client):
     """Test API endpoint with invalid city."""
     response = client.get("/api/weather?city=InvalidCityName123")
@@ -54,6 +210,444 @@ def test_api_weather_invalid_city(client):
     assert "error" in data
 
 
+def test_api_forecast_demo_city(client, monkeypatch):
+    """Test daily forecast summaries for a demo city."""
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "demo_key")
+    response = client.get("/api/forecast?city=London&country=GB")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["city"] == "London"
+    assert 1 <= len(data["days"]) <= weather_web_app_enhanced.FORECAST_DAYS
+    for day in data["days"]:
+        assert day["temp_min"] <= day["temp_mean"] <= day["temp_max"]
+        assert day["precipitation"] >= 0
+
+
+def test_api_forecast_many_cities(client, monkeypatch):
+    """Test summarizing several cities in one request."""
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "demo_key")
+    response = client.get("/api/forecast?cities=London,GB;Paris,FR;Nowhere&days=2")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [f["city"] for f in data["forecasts"]] == ["London", "Paris"]
+    assert data["not_found"] == ["Nowhere"]
+    assert all(len(f["days"]) <= 2 for f in data["forecasts"])
+
+
+def test_api_forecast_many_cities_caps_upstream_fetches(
+    client, monkeypatch, fresh_upstream
+):
+    """Test that a multi-city request makes a bounded number of fetches."""
+    calls = []
+
+    def failing_get(*args, **kwargs):
+        calls.append(kwargs["params"]["q"])
+        raise requests.ConnectionError("upstream down")
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "test_key")
+    monkeypatch.setattr(weather_web_app_enhanced, "BREAKER_THRESHOLD", 100)
+    monkeypatch.setattr(weather_web_app_enhanced, "_forecast_cache", {})
+    monkeypatch.setattr(weather_web_app_enhanced, "_forecast_misses", {})
+    monkeypatch.setattr(requests, "get", failing_get)
+    cities = ";".join(["London,GB", "Paris,FR", "Rome,IT", "Madrid,ES", "Berlin,DE"])
+    response = client.get(f"/api/forecast?cities={cities}")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    limit = weather_web_app_enhanced.MAX_FORECAST_FETCHES
+    assert len(calls) == limit
+    assert len(data["forecasts"]) == limit
+    assert data["pending"] == ["London", "Paris", "Rome", "Madrid", "Berlin"][limit:]
+
+
+def test_api_forecast_retries_move_past_unknown_cities(
+    client, monkeypatch, fresh_upstream
+):
+    """Test that cached misses let later requests fetch the pending cities."""
+    calls = []
+
+    class NotFound:
+        status_code = 404
+
+    def not_found_get(*args, **kwargs):
+        calls.append(kwargs["params"]["q"])
+        return NotFound()
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "test_key")
+    monkeypatch.setattr(weather_web_app_enhanced, "_forecast_cache", {})
+    monkeypatch.setattr(weather_web_app_enhanced, "_forecast_misses", {})
+    monkeypatch.setattr(requests, "get", not_found_get)
+    url = "/api/forecast?cities=Nowhere1;Nowhere2;Nowhere3;London,GB"
+
+    data = json.loads(client.get(url).data)
+    assert data["pending"] == ["London"]
+    assert len(calls) == 3
+
+    data = json.loads(client.get(url).data)
+    assert data["pending"] == []
+    assert data["not_found"] == ["Nowhere1", "Nowhere2", "Nowhere3"]
+    assert [f["city"] for f in data["forecasts"]] == ["London"]
+    assert calls[3:] == ["London,GB"]
+
+
+def test_api_forecast_open_breaker_serves_demo_without_budget(
+    client, monkeypatch, fresh_upstream
+):
+    """Test that no fetch budget is charged while the breaker is open."""
+
+    def unexpected_get(*args, **kwargs):
+        raise AssertionError("breaker is open, no upstream calls expected")
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "test_key")
+    monkeypatch.setattr(weather_web_app_enhanced, "_forecast_cache", {})
+    monkeypatch.setattr(weather_web_app_enhanced, "_forecast_misses", {})
+    monkeypatch.setattr(requests, "get", unexpected_get)
+    weather_web_app_enhanced._upstream_state["open_until"] = (
+        weather_web_app_enhanced.time.time() + 60
+    )
+    cities = ";".join(["London,GB", "Paris,FR", "Rome,IT", "Madrid,ES", "Berlin,DE"])
+    data = json.loads(client.get(f"/api/forecast?cities={cities}").data)
+    assert data["pending"] == []
+    assert len(data["forecasts"]) == 5
+
+
+def test_api_forecast_missing_city(client):
+    """Test forecast endpoint without city parameter."""
+    response = client.get("/api/forecast")
+    assert response.status_code == 400
+
+
+def test_summarize_forecasts():
+    """Test daily aggregation over hand-built series."""
+    np = weather_web_app_enhanced._numpy()
+    series = weather_web_app_enhanced.ForecastSeries
+    day = 86400
+    first = series(
+        "A",
+        "AA",
+        0,
+        np.array([0, 3 * 3600, day, day + 3 * 3600], dtype=np.int64),
+        np.array([10, 20, 5, 7], dtype=np.float32),
+        np.array([0, 1.5, 2, 0], dtype=np.float32),
+    )
+    second = series(
+        "B",
+        "BB",
+        3600,
+        np.array([-3600, 0], dtype=np.int64),
+        np.array([1, 3], dtype=np.float32),
+        np.array([0.5, 0.5], dtype=np.float32),
+    )
+    summaries = weather_web_app_enhanced.summarize_forecasts([first, second])
+    assert summaries[0]["days"] == [
+        {
+            "date": "1970-01-01",
+            "temp_min": 10.0,
+            "temp_max": 20.0,
+            "temp_mean": 15.0,
+            "precipitation": 1.5,
+        },
+        {
+            "date": "1970-01-02",
+            "temp_min": 5.0,
+            "temp_max": 7.0,
+            "temp_mean": 6.0,
+            "precipitation": 2.0,
+        },
+    ]
+    assert summaries[1]["days"] == [
+        {
+            "date": "1970-01-01",
+            "temp_min": 1.0,
+            "temp_max": 3.0,
+            "temp_mean": 2.0,
+            "precipitation": 1.0,
+        }
+    ]
+
+
+def test_api_history_disabled(client, monkeypatch):
+    """Test that history queries fail cleanly when the log is off."""
+    monkeypatch.setattr(weather_web_app_enhanced, "HISTORY", None)
+    response = client.get("/api/history?city=London")
+    assert response.status_code == 404
+
+
+def test_api_history_buckets(client, monkeypatch, tmp_path):
+    """Test downsampled min/max/avg buckets across day partitions."""
+    history = weather_web_app_enhanced.HistoryLog(str(tmp_path))
+    monkeypatch.setattr(weather_web_app_enhanced, "HISTORY", history)
+    demo = weather_web_app_enhanced.DEMO_DATA["london,gb"]
+    day = 86400
+    for ts, temp in [(0, 10.4), (3600, 14), (day, 20), (day + 60, 30)]:
+        data = dict(demo, main=dict(demo["main"], temp=temp))
+        history.append(
+            weather_web_app_enhanced.Observation(data, "United Kingdom", "GB", ts)
+        )
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["1970-01-01", "1970-01-02"]
+
+    response = client.get(
+        f"/api/history?city=london&country=gb&start=0&end={2 * day}&buckets=2"
+    )
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["step"] == day
+    assert [b["count"] for b in data["buckets"]] == [2, 2]
+    assert data["buckets"][0]["temperature"] == {"min": 10.4, "max": 14, "avg": 12.2}
+    assert data["buckets"][1]["temperature"] == {"min": 20, "max": 30, "avg": 25}
+
+    response = client.get("/api/history?city=Paris&start=0&end=100000")
+    assert json.loads(response.data)["buckets"] == []
+
+
+def test_api_export_streams_catalogue(client, monkeypatch):
+    """Test NDJSON export of every demo city, with filters."""
+    monkeypatch.setattr(weather_web_app_enhanced, "_observation_cache", {})
+    response = client.get("/api/export")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert len(lines) == len(weather_web_app_enhanced.DEMO_DATA)
+
+    response = client.get("/api/export?region=Oceania")
+    cities = [json.loads(line)["city"] for line in response.data.splitlines()]
+    assert cities == ["Sydney", "Auckland"]
+
+    response = client.get("/api/export?country=us")
+    assert len(response.data.splitlines()) == 3
+
+
+def test_api_export_counts_as_in_flight_while_streaming(client):
+    """Test that a streaming export is visible to the readiness probe."""
+    response = client.get("/api/export", buffered=False)
+    lines = response.iter_encoded()
+    next(lines)
+    assert weather_web_app_enhanced._in_flight == 1
+    for _ in lines:
+        pass
+    response.close()
+    assert weather_web_app_enhanced._in_flight == 0
+
+
+def test_api_export_skips_expired_observations(client, monkeypatch):
+    """Test that cache entries past the TTL are not exported as current."""
+    demo = weather_web_app_enhanced.DEMO_DATA["paris,fr"]
+    stale = weather_web_app_enhanced.Observation(demo, "FR", "FR")
+    stored_at = weather_web_app_enhanced.time.time() - (
+        10 * weather_web_app_enhanced.CACHE_TTL
+    )
+    monkeypatch.setattr(
+        weather_web_app_enhanced, "_observation_cache", {"paris,fr": (stored_at, stale)}
+    )
+    response = client.get("/api/export?country=FR")
+    assert [json.loads(line)["source"] for line in response.data.splitlines()] == [
+        "demo"
+    ]
+
+
+def test_api_export_rejects_invalid_since(client):
+    """Test that unparsable or out-of-range since values return 400."""
+    for since in ["yesterday", "inf", "1e400", "nan", "1e20"]:
+        response = client.get(f"/api/export?since={since}")
+        assert response.status_code == 400, since
+
+
+def test_api_export_since_returns_new_observations(client, monkeypatch):
+    """Test that cached real observations replace demo ones and honour since."""
+    monkeypatch.setattr(weather_web_app_enhanced, "_observation_cache", {})
+    demo = weather_web_app_enhanced.DEMO_DATA["paris,fr"]
+    since = int(weather_web_app_enhanced.time.time()) + 60
+    real = weather_web_app_enhanced.Observation(
+        dict(demo, name="Paris"), "FR", "FR", since + 1
+    )
+    weather_web_app_enhanced._cache_store(
+        weather_web_app_enhanced._observation_cache, "paris,fr", real
+    )
+
+    response = client.get(f"/api/export?since={since}")
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["city"] == "Paris"
+    assert lines[0]["source"] == "api"
+
+    response = client.get("/api/export?country=FR")
+    assert [json.loads(line)["source"] for line in response.data.splitlines()] == [
+        "api"
+    ]
+
+
+def test_api_history_rejects_out_of_range_times(client, monkeypatch, tmp_path):
+    """Test that non-finite or huge times are rejected rather than crashing."""
+    history = weather_web_app_enhanced.HistoryLog(str(tmp_path))
+    monkeypatch.setattr(weather_web_app_enhanced, "HISTORY", history)
+    for query in ["start=inf", "start=1e400", "end=1e20", "start=nan", "start=-5"]:
+        response = client.get(f"/api/history?city=London&{query}")
+        assert response.status_code == 400, query
+
+    (tmp_path / "not-a-day").mkdir()
+    response = client.get("/api/history?city=London&start=0&end=253402300799")
+    assert response.status_code == 200
+    assert json.loads(response.data)["buckets"] == []
+
+
+def _history_observation(ts, temp=10):
+    demo = weather_web_app_enhanced.DEMO_DATA["london,gb"]
+    data = dict(demo, main=dict(demo["main"], temp=temp))
+    return weather_web_app_enhanced.Observation(data, "United Kingdom", "GB", ts)
+
+
+def _column_rows(path):
+    return {
+        name: (path / name).stat().st_size
+        // weather_web_app_enhanced.struct.calcsize(code)
+        for name, code in weather_web_app_enhanced.HistoryLog.COLUMNS
+    }
+
+
+def test_history_append_keeps_columns_aligned(monkeypatch, tmp_path):
+    """Test that failed or half-written rows do not misalign columns."""
+    history = weather_web_app_enhanced.HistoryLog(str(tmp_path))
+    history.append(_history_observation(0))
+    partition = tmp_path / "1970-01-01"
+
+    # A crash left an extra value in one column
+    with open(partition / "ts", "ab") as column:
+        column.write(b"\0" * 8)
+    history.append(_history_observation(60))
+    assert set(_column_rows(partition).values()) == {2}
+
+    # A write failure part-way through a row is rolled back
+    real_pack = weather_web_app_enhanced.struct.pack
+    calls = []
+
+    def failing_pack(code, value):
+        calls.append(code)
+        if len(calls) == 4:
+            raise OSError("No space left on device")
+        return real_pack(code, value)
+
+    monkeypatch.setattr(weather_web_app_enhanced.struct, "pack", failing_pack)
+    with pytest.raises(OSError):
+        history.append(_history_observation(120))
+    assert set(_column_rows(partition).values()) == {2}
+
+
+def test_history_append_skips_repeated_readings(tmp_path):
+    """Test that the same upstream reading is logged only once per city."""
+    history = weather_web_app_enhanced.HistoryLog(str(tmp_path))
+    history.append(_history_observation(60))
+    history.append(_history_observation(60, temp=11))
+    paris = weather_web_app_enhanced.Observation(
+        weather_web_app_enhanced.DEMO_DATA["paris,fr"], "France", "FR", 60
+    )
+    history.append(paris)
+    history.append(_history_observation(120))
+    assert set(_column_rows(tmp_path / "1970-01-01").values()) == {3}
+
+
+def test_history_logs_only_upstream_observations(
+    client, monkeypatch, tmp_path, fresh_upstream
+):
+    """Test that demo readings never reach the history log."""
+    history = weather_web_app_enhanced.HistoryLog(str(tmp_path))
+    monkeypatch.setattr(weather_web_app_enhanced, "HISTORY", history)
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "demo_key")
+    assert client.get("/api/weather?city=Rome").status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            data = dict(weather_web_app_enhanced.DEMO_DATA["rome,it"])
+            return dict(data, sys={"country": "IT"}, dt=3600)
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "test_key")
+    monkeypatch.setattr(weather_web_app_enhanced, "_observation_cache", {})
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: FakeResponse())
+    client.get("/api/weather?city=Rome&country=IT")
+    client.get("/api/weather?city=Rome&country=IT")
+    assert _column_rows(tmp_path / "1970-01-01")["ts"] == 1
+
+
+def test_liveness_probe(client):
+    """Test that the liveness probe always answers."""
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert json.loads(response.data)["status"] == "alive"
+
+
+def test_readiness_probe(client):
+    """Test that the readiness probe reports serving state."""
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["status"] == "ready"
+    assert data["upstream"]["breaker"] in ["open", "closed"]
+    assert data["workers"]["in_flight"] == 0
+
+
+def test_readiness_probe_saturated(client, monkeypatch):
+    """Test that a saturated instance is taken out of rotation."""
+    monkeypatch.setattr(weather_web_app_enhanced, "MAX_IN_FLIGHT", 0)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert json.loads(response.data)["status"] == "saturated"
+
+
+def test_breaker_skips_upstream_after_failures(client, monkeypatch, fresh_upstream):
+    """Test that repeated upstream failures open the circuit breaker."""
+    calls = []
+
+    def failing_get(*args, **kwargs):
+        calls.append(args)
+        raise requests.ConnectionError("upstream down")
+
+    monkeypatch.setattr(weather_web_app_enhanced, "API_KEY", "test_key")
+    monkeypatch.setattr(requests, "get", failing_get)
+    threshold = weather_web_app_enhanced.BREAKER_THRESHOLD
+    for _ in range(threshold + 2):
+        response = client.get("/api/weather?city=Paris&country=FR")
+        assert response.status_code == 200
+    assert len(calls) == threshold
+
+    data = json.loads(client.get("/health/ready").data)
+    assert data["upstream"]["status"] == "unavailable"
+    assert data["upstream"]["breaker"] == "open"
+
+
+def test_cold_start_budget():
+    """Test import time and time-to-first-response in a fresh process."""
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=weather_web_app_enhanced.app.root_path,
+    )
+    timings = json.loads(result.stdout)
+    assert timings["status"] == 200
+    assert not timings["requests_loaded"]
+    assert not timings["numpy_loaded"]
+    assert timings["import"] < IMPORT_BUDGET
+    assert timings["first_response"] < FIRST_RESPONSE_BUDGET
+
+
+def test_unusable_template_cache_dir_is_skipped(tmp_path):
+    """Test that an uncreatable TEMPLATE_CACHE_DIR does not break start-up."""
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=weather_web_app_enhanced.app.root_path,
+        env=dict(os.environ, TEMPLATE_CACHE_DIR=str(blocker / "cache")),
+    )
+    assert json.loads(result.stdout)["status"] == 200
+    assert "Template cache disabled" in result.stderr
+
+
 def test_app_configuration():
     """Test that the app is configured correctly."""
     assert app.config["TESTING"] == True
@@ -5,277 +5,402 @@ Option 1: More demo cities
 Option 2: Real API integration
 """
 
+import calendar
+import json
 import os
-from datetime import datetime
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
 
-import requests
-from flask import Flask, jsonify, render_template_string, request
+from flask import Flask, jsonify, render_template, request
+from jinja2 import FileSystemBytecodeCache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# The upstream HTTP client and numpy are imported on first use (see _http
+# and _numpy) so they do not slow down start-up
+requests = None
+np = None
+
+# orjson is optional; it is used for response encoding when installed
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
 
 app = Flask(__name__)
 
+
+def dumps_json(obj):
+    """Encode obj as compact UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+# Compiled templates are cached on disk when TEMPLATE_CACHE_DIR is set, so a
+# fresh process can skip template compilation (see --prebuild below)
+TEMPLATE_CACHE_DIR = os.environ.get("TEMPLATE_CACHE_DIR")
+if TEMPLATE_CACHE_DIR:
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    except OSError as exc:
+        # e.g. a bind mount hiding the prebuilt cache with a read-only dir
+        app.logger.warning("Template cache disabled: %s", exc)
+    else:
+        app.jinja_options = dict(
+            app.jinja_options,
+            bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+        )
+
 # OpenWeatherMap API key (replace with your own)
 API_KEY = "7ec7dd35b9c60e4a1768a3d26ae779ee"  # Your actual API key
 API_URL = "https://api.openweathermap.org/data/2.5/weather"
+FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+
+# 5 day / 3 hour forecast shape, as served by OpenWeatherMap
+FORECAST_STEP = 3 * 3600
+FORECAST_STEPS = 40
+FORECAST_DAYS = 5
+# Upper bound on cities summarized by one /api/forecast request
+MAX_FORECAST_CITIES = int(os.environ.get("MAX_FORECAST_CITIES", "50"))
+# Upper bound on upstream forecast fetches made by one multi-city request;
+# further uncached cities are reported as pending
+MAX_FORECAST_FETCHES = int(os.environ.get("MAX_FORECAST_FETCHES", "3"))
+# Failed or unknown-city forecast lookups are not retried upstream for this
+# many seconds, so retries of a multi-city request reach the pending cities
+FORECAST_MISS_TTL = int(os.environ.get("FORECAST_MISS_TTL", "60"))
+
+# Optional on-disk observation history, enabled by setting HISTORY_DIR
+HISTORY_DIR = os.environ.get("HISTORY_DIR")
+HISTORY_DEFAULT_RANGE = 7 * 86400
+# Accepted query times: the Unix epoch up to the end of year 9999
+MAX_TIMESTAMP = 253402300799
+MAX_HISTORY_BUCKETS = 1000
+
+# Upstream observations are cached for this many seconds (and entries)
+CACHE_TTL = int(os.environ.get("WEATHER_CACHE_TTL", "600"))
+CACHE_MAX_ENTRIES = int(os.environ.get("WEATHER_CACHE_MAX_ENTRIES", "1024"))
 
-# Enhanced demo data with more popular cities
-DEMO_DATA = {
-    # Europe
-    "london,gb": {
-        "name": "London",
-        "country": "United Kingdom",
-        "weather": [{"main": "Clouds", "description": "broken clouds", "icon": "04d"}],
-        "main": {"temp": 15, "feels_like": 13, "humidity": 72, "pressure": 1013},
-        "wind": {"speed": 5.2},
-        "visibility": 10000,
-    },
-    "paris,fr": {
-        "name": "Paris",
-        "country": "France",
-        "weather": [{"main": "Clouds", "description": "partly cloudy", "icon": "02d"}],
-        "main": {"temp": 20, "feels_like": 22, "humidity": 68, "pressure": 1018},
-        "wind": {"speed": 3.5},
-        "visibility": 15000,
-    },
-    "rome,it": {
-        "name": "Rome",
-        "country": "Italy",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 25, "feels_like": 27, "humidity": 60, "pressure": 1020},
-        "wind": {"speed": 2.8},
-        "visibility": 16000,
-    },
-    "madrid,es": {
-        "name": "Madrid",
-        "country": "Spain",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 26, "feels_like": 28, "humidity": 55, "pressure": 1019},
-        "wind": {"speed": 3.2},
-        "visibility": 18000,
-    },
-    "berlin,de": {
-        "name": "Berlin",
-        "country": "Germany",
-        "weather": [
-            {"main": "Clouds", "description": "overcast clouds", "icon": "04d"}
-        ],
-        "main": {"temp": 18, "feels_like": 19, "humidity": 75, "pressure": 1015},
-        "wind": {"speed": 4.1},
-        "visibility": 12000,
-    },
-    "amsterdam,nl": {
-        "name": "Amsterdam",
-        "country": "Netherlands",
-        "weather": [{"main": "Rain", "description": "light rain", "icon": "10d"}],
-        "main": {"temp": 16, "feels_like": 15, "humidity": 85, "pressure": 1010},
-        "wind": {"speed": 5.5},
-        "visibility": 8000,
-    },
-    # North America
-    "new york,us": {
-        "name": "New York",
-        "country": "United States",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 22, "feels_like": 24, "humidity": 55, "pressure": 1020},
-        "wind": {"speed": 3.8},
-        "visibility": 16000,
-    },
-    "los angeles,us": {
-        "name": "Los Angeles",
-        "country": "United States",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 28, "feels_like": 30, "humidity": 45, "pressure": 1022},
-        "wind": {"speed": 2.5},
-        "visibility": 20000,
-    },
-    "chicago,us": {
-        "name": "Chicago",
-        "country": "United States",
-        "weather": [{"main": "Snow", "description": "light snow", "icon": "13d"}],
-        "main": {"temp": 2, "feels_like": -2, "humidity": 80, "pressure": 1008},
-        "wind": {"speed": 6.2},
-        "visibility": 5000,
-    },
-    "toronto,ca": {
-        "name": "Toronto",
-        "country": "Canada",
-        "weather": [{"main": "Clouds", "description": "few clouds", "icon": "02d"}],
-        "main": {"temp": 10, "feels_like": 8, "humidity": 70, "pressure": 1016},
-        "wind": {"speed": 4.5},
-        "visibility": 14000,
-    },
-    "mexico city,mx": {
-        "name": "Mexico City",
-        "country": "Mexico",
-        "weather": [
-            {"main": "Clouds", "description": "scattered clouds", "icon": "03d"}
-        ],
-        "main": {"temp": 24, "feels_like": 26, "humidity": 62, "pressure": 1012},
-        "wind": {"speed": 3.0},
-        "visibility": 13000,
-    },
-    # Asia
-    "tokyo,jp": {
-        "name": "Tokyo",
-        "country": "Japan",
-        "weather": [{"main": "Rain", "description": "light rain", "icon": "10d"}],
-        "main": {"temp": 18, "feels_like": 19, "humidity": 85, "pressure": 1008},
-        "wind": {"speed": 2.5},
-        "visibility": 8000,
-    },
-    "beijing,cn": {
-        "name": "Beijing",
-        "country": "China",
-        "weather": [{"main": "Haze", "description": "haze", "icon": "50d"}],
-        "main": {"temp": 12, "feels_like": 10, "humidity": 65, "pressure": 1018},
-        "wind": {"speed": 1.8},
-        "visibility": 6000,
-    },
-    "mumbai,in": {
-        "name": "Mumbai",
-        "country": "India",
-        "weather": [{"main": "Clouds", "description": "broken clouds", "icon": "04d"}],
-        "main": {"temp": 32, "feels_like": 38, "humidity": 78, "pressure": 1005},
-        "wind": {"speed": 4.2},
-        "visibility": 9000,
-    },
-    "seoul,kr": {
-        "name": "Seoul",
-        "country": "South Korea",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 15, "feels_like": 16, "humidity": 58, "pressure": 1020},
-        "wind": {"speed": 2.9},
-        "visibility": 15000,
-    },
-    "bangkok,th": {
-        "name": "Bangkok",
-        "country": "Thailand",
-        "weather": [
-            {"main": "Thunderstorm", "description": "thunderstorm", "icon": "11d"}
-        ],
-        "main": {"temp": 35, "feels_like": 42, "humidity": 88, "pressure": 1002},
-        "wind": {"speed": 1.5},
-        "visibility": 7000,
-    },
-    # Africa
-    "rabat,ma": {
-        "name": "Rabat",
-        "country": "Morocco",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 28, "feels_like": 30, "humidity": 65, "pressure": 1015},
-        "wind": {"speed": 4.1},
-        "visibility": 12000,
-    },
-    "cairo,eg": {
-        "name": "Cairo",
-        "country": "Egypt",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 35, "feels_like": 38, "humidity": 35, "pressure": 1018},
-        "wind": {"speed": 3.5},
-        "visibility": 18000,
-    },
-    "lagos,ng": {
-        "name": "Lagos",
-        "country": "Nigeria",
-        "weather": [{"main": "Rain", "description": "heavy rain", "icon": "09d"}],
-        "main": {"temp": 28, "feels_like": 33, "humidity": 92, "pressure": 1008},
-        "wind": {"speed": 2.8},
-        "visibility": 4000,
-    },
-    "cape town,za": {
-        "name": "Cape Town",
-        "country": "South Africa",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 22, "feels_like": 24, "humidity": 55, "pressure": 1020},
-        "wind": {"speed": 5.2},
-        "visibility": 16000,
-    },
-    # South America
-    "sao paulo,br": {
-        "name": "São Paulo",
-        "country": "Brazil",
-        "weather": [{"main": "Rain", "description": "moderate rain", "icon": "10d"}],
-        "main": {"temp": 25, "feels_like": 28, "humidity": 85, "pressure": 1010},
-        "wind": {"speed": 3.2},
-        "visibility": 8000,
-    },
-    "buenos aires,ar": {
-        "name": "Buenos Aires",
-        "country": "Argentina",
-        "weather": [{"main": "Clouds", "description": "few clouds", "icon": "02d"}],
-        "main": {"temp": 20, "feels_like": 21, "humidity": 68, "pressure": 1016},
-        "wind": {"speed": 4.0},
-        "visibility": 14000,
-    },
-    "lima,pe": {
-        "name": "Lima",
-        "country": "Peru",
-        "weather": [{"main": "Mist", "description": "mist", "icon": "50d"}],
-        "main": {"temp": 19, "feels_like": 20, "humidity": 82, "pressure": 1014},
-        "wind": {"speed": 2.1},
-        "visibility": 10000,
-    },
-    # Oceania
-    "sydney,au": {
-        "name": "Sydney",
-        "country": "Australia",
-        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
-        "main": {"temp": 26, "feels_like": 28, "humidity": 60, "pressure": 1018},
-        "wind": {"speed": 3.8},
-        "visibility": 17000,
-    },
-    "auckland,nz": {
-        "name": "Auckland",
-        "country": "New Zealand",
-        "weather": [{"main": "Rain", "description": "light rain", "icon": "10d"}],
-        "main": {"temp": 16, "feels_like": 17, "humidity": 80, "pressure": 1012},
-        "wind": {"speed": 4.5},
-        "visibility": 11000,
-    },
+# City shown when the page first loads
+DEFAULT_CITY = ("London", "GB")
+
+# Circuit breaker: after BREAKER_THRESHOLD consecutive upstream failures the
+# real API is skipped for BREAKER_COOLDOWN seconds and demo data is served
+BREAKER_THRESHOLD = int(os.environ.get("BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = int(os.environ.get("BREAKER_COOLDOWN", "60"))
+
+# Readiness reports "saturated" once this many requests are in flight
+MAX_IN_FLIGHT = int(os.environ.get("MAX_IN_FLIGHT", "32"))
+
+# Serving state, updated on the request path so probes only read it
+_state_lock = threading.Lock()
+_in_flight = 0
+_upstream_state = {
+    "consecutive_failures": 0,
+    "open_until": 0.0,
+    "last_success": None,
+    "last_failure": None,
 }
+_observation_cache = {}
+_forecast_cache = {}
+_forecast_misses = {}
+
+# Enhanced demo data with more popular cities, prebuilt as JSON so that
+# importing the app does not have to build a large dict literal
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+with open(os.path.join(DATA_DIR, "demo_cities.json"), encoding="utf-8") as _f:
+    DEMO_DATA = json.load(_f)
+
+
+# Region of each country that has a demo city, used to tag real observations
+COUNTRY_REGIONS = {
+    key.partition(",")[2].upper(): value["region"] for key, value in DEMO_DATA.items()
+}
+
+# Emoji for each OpenWeatherMap icon code
+ICON_MAP = {
+    "01d": "☀️",
+    "01n": "🌙",
+    "02d": "⛅",
+    "02n": "⛅",
+    "03d": "☁️",
+    "03n": "☁️",
+    "04d": "☁️",
+    "04n": "☁️",
+    "09d": "🌧️",
+    "09n": "🌧️",
+    "10d": "🌦️",
+    "10n": "🌦️",
+    "11d": "⛈️",
+    "11n": "⛈️",
+    "13d": "❄️",
+    "13n": "❄️",
+    "50d": "🌫️",
+    "50n": "🌫️",
+}
+
+
+# Display units per OpenWeatherMap "units" value:
+# (temperature, wind speed, visibility)
+UNITS = {
+    "metric": ("°C", "m/s", "km"),
+    "imperial": ("°F", "mph", "mi"),
+    "standard": ("K", "m/s", "km"),
+}
+MPH_PER_MS = 2.236936
+METERS_PER_MILE = 1609.344
+
+# Prebuilt description translations, keyed by language then by condition
+# code (the icon code without its day/night suffix)
+with open(os.path.join(DATA_DIR, "descriptions.json"), encoding="utf-8") as _f:
+    DESCRIPTIONS = json.load(_f)
+LANGUAGES = ("en",) + tuple(DESCRIPTIONS)
 
 
 def get_weather_icon(icon_code):
     """Return emoji icon based on weather code"""
-    icon_map = {
-        "01d": "☀️",
-        "01n": "🌙",
-        "02d": "⛅",
-        "02n": "⛅",
-        "03d": "☁️",
-        "03n": "☁️",
-        "04d": "☁️",
-        "04n": "☁️",
-        "09d": "🌧️",
-        "09n": "🌧️",
-        "10d": "🌦️",
-        "10n": "🌦️",
-        "11d": "⛈️",
-        "11n": "⛈️",
-        "13d": "❄️",
-        "13n": "❄️",
-        "50d": "🌫️",
-        "50n": "🌫️",
-    }
-    return icon_map.get(icon_code, "🌤️")
+    return ICON_MAP.get(icon_code, "🌤️")
+
+
+def _timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Observation:
+    """Normalized current conditions for one city.
+
+    Built once per upstream observation (or once per demo city at import)
+    from the canonical, unrounded metric values. Unit and language variants
+    are derived locally from those. The default variant is encoded to JSON
+    at construction and other variants on first use, so rounding, conversion
+    and encoding are not repeated for every response; only the timestamp is
+    added per request.
+    """
+
+    __slots__ = (
+        "city",
+        "country",
+        "description",
+        "icon",
+        "humidity",
+        "pressure",
+        "country_code",
+        "region",
+        "condition",
+        "observed_at",
+        "expires_at",
+        "_canonical",
+        "_encoded",
+    )
+
+    def __init__(self, data, country, country_code, observed_at=None):
+        self.city = data["name"]
+        self.country = country
+        self.country_code = country_code
+        self.region = data.get("region") or COUNTRY_REGIONS.get(country_code)
+        self.observed_at = time.time() if observed_at is None else observed_at
+        # When the server cache drops this observation; None never expires
+        self.expires_at = None
+        # (temperature, feels_like, wind_speed, visibility) in °C, m/s and m
+        self._canonical = (
+            data["main"]["temp"],
+            data["main"]["feels_like"],
+            data["wind"]["speed"],
+            data["visibility"],
+        )
+        self.description = data["weather"][0]["description"]
+        self.condition = data["weather"][0]["icon"][:2]
+        self.icon = get_weather_icon(data["weather"][0]["icon"])
+        self.humidity = data["main"]["humidity"]
+        self.pressure = data["main"]["pressure"]
+        self._encoded = {}
+        self.encode()
+
+    @property
+    def temperature_c(self):
+        """Unrounded temperature in °C"""
+        return self._canonical[0]
+
+    @property
+    def wind_speed_ms(self):
+        """Unrounded wind speed in m/s"""
+        return self._canonical[2]
+
+    def payload(self, units="metric", lang="en"):
+        """Return the API fields (without timestamp) for a unit/language variant"""
+        temp, feels_like, wind_speed, visibility = self._canonical
+        if units == "imperial":
+            temp, feels_like = temp * 9 / 5 + 32, feels_like * 9 / 5 + 32
+            wind_speed = round(wind_speed * MPH_PER_MS, 1)
+            visibility = visibility / METERS_PER_MILE
+        else:
+            if units == "standard":
+                temp, feels_like = temp + 273.15, feels_like + 273.15
+            visibility = visibility / 1000
+
+        description = self.description
+        if lang != "en":
+            description = DESCRIPTIONS[lang].get(self.condition, description)
+
+        temperature_unit, wind_speed_unit, visibility_unit = UNITS[units]
+        return {
+            "city": self.city,
+            "country": self.country,
+            "temperature": round(temp),
+            "feels_like": round(feels_like),
+            "description": description,
+            "icon": self.icon,
+            "humidity": self.humidity,
+            "wind_speed": wind_speed,
+            "pressure": self.pressure,
+            "visibility": round(visibility, 1),
+            "temperature_unit": temperature_unit,
+            "wind_speed_unit": wind_speed_unit,
+            "visibility_unit": visibility_unit,
+        }
+
+    def max_age(self):
+        """Seconds clients may reuse this observation without refetching"""
+        if self.expires_at is None:
+            return CACHE_TTL
+        return max(0, int(self.expires_at - time.time()))
+
+    def to_dict(self, timestamp=None, units="metric", lang="en"):
+        """Return the API payload as a dict"""
+        payload = self.payload(units, lang)
+        payload["timestamp"] = timestamp or _timestamp()
+        payload["max_age"] = self.max_age()
+        return payload
+
+    def encode(self, units="metric", lang="en"):
+        """Encode and memoize one variant, up to the timestamp value"""
+        # b'{...,"timestamp":"' so a response only appends the timestamp
+        # and max_age
+        prefix = dumps_json(self.payload(units, lang))[:-1] + b',"timestamp":"'
+        self._encoded[(units, lang)] = prefix
+        return prefix
+
+    def to_json(self, timestamp=None, units="metric", lang="en"):
+        """Return the API payload as UTF-8 JSON bytes"""
+        prefix = self._encoded.get((units, lang)) or self.encode(units, lang)
+        suffix = f'{timestamp or _timestamp()}","max_age":{self.max_age()}}}'
+        return prefix + suffix.encode()
+
+
+# Demo cities are normalized, and every unit/language variant encoded, at import
+DEMO_OBSERVATIONS = {
+    key: Observation(value, value["country"], key.partition(",")[2].upper())
+    for key, value in DEMO_DATA.items()
+}
+for _observation in DEMO_OBSERVATIONS.values():
+    for _units in UNITS:
+        for _lang in LANGUAGES:
+            _observation.encode(_units, _lang)
+
+
+def _record_upstream_result(ok):
+    """Update the circuit breaker after an upstream call"""
+    now = time.time()
+    with _state_lock:
+        if ok:
+            _upstream_state["consecutive_failures"] = 0
+            _upstream_state["open_until"] = 0.0
+            _upstream_state["last_success"] = now
+        else:
+            _upstream_state["consecutive_failures"] += 1
+            _upstream_state["last_failure"] = now
+            if _upstream_state["consecutive_failures"] >= BREAKER_THRESHOLD:
+                _upstream_state["open_until"] = now + BREAKER_COOLDOWN
+
+
+def _breaker_open(now=None):
+    """True while the breaker is skipping the upstream API"""
+    return _upstream_state["open_until"] > (now or time.time())
+
+
+def _cache_store(cache, cache_key, data):
+    """Store an upstream result, evicting the oldest entry when full"""
+    with _state_lock:
+        cache.pop(cache_key, None)
+        cache[cache_key] = (time.time(), data)
+        while len(cache) > CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+
+
+def _http():
+    """Import the upstream HTTP client on first use"""
+    global requests
+    if requests is None:
+        import requests as _requests
+
+        requests = _requests
+    return requests
+
+
+def _numpy():
+    """Import numpy on first use"""
+    global np
+    if np is None:
+        import numpy as _np
+
+        np = _np
+    return np
+
+
+def cached_real_weather(city, country=""):
+    """Return a fresh cached Observation without any network call"""
+    query = f"{city},{country}" if country else city
+    cached = _observation_cache.get(query.lower())
+    if cached and time.time() - cached[0] < CACHE_TTL:
+        return cached[1]
+    return None
 
 
 def fetch_real_weather(city, country=""):
-    """Fetch weather from real OpenWeatherMap API"""
+    """Fetch weather from real OpenWeatherMap API as an Observation"""
     if API_KEY == "demo_key":
         return None
 
+    query = f"{city},{country}" if country else city
+    cache_key = query.lower()
+    cached = cached_real_weather(city, country)
+    if cached:
+        return cached
+
+    if _breaker_open():
+        return None
+
+    http = _http()
     try:
-        query = f"{city},{country}" if country else city
         params = {"q": query, "appid": API_KEY, "units": "metric"}
 
-        response = requests.get(API_URL, params=params, timeout=10)
+        response = http.get(API_URL, params=params, timeout=10)
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            country = data["sys"]["country"]
+            observation = Observation(data, country, country, data.get("dt"))
         else:
+            # An unknown city still means the upstream is reachable
+            _record_upstream_result(response.status_code == 404)
             return None
-    except:
+    except (http.RequestException, ValueError, KeyError, TypeError):
+        _record_upstream_result(False)
         return None
 
+    _record_upstream_result(True)
+    observation.expires_at = time.time() + CACHE_TTL
+    _cache_store(_observation_cache, cache_key, observation)
+    record_history(observation)
+    return observation
+
 
 def get_popular_cities():
     """Get list of popular cities for demo buttons"""
@@ -300,371 +425,300 @@ def get_popular_cities():
     return popular
 
 
+def _add_in_flight(delta):
+    global _in_flight
+    with _state_lock:
+        _in_flight += delta
+
+
+@app.before_request
+def _track_request_start():
+    """Count in-flight requests for the readiness probe"""
+    if not request.path.startswith("/health"):
+        _add_in_flight(1)
+        request.environ["weather_app.tracked"] = True
+
+
+@app.teardown_request
+def _track_request_end(exc=None):
+    if request.environ.pop("weather_app.tracked", False):
+        _add_in_flight(-1)
+
+
 @app.route("/")
 def index():
     """Main page with enhanced interface"""
     popular_cities = get_popular_cities()
     api_status = "Real API" if API_KEY != "demo_key" else "Demo Mode"
+    # Embed the default city so the page needs no follow-up API request. With
+    # the real API only a cached real observation is embedded; demo data
+    # must not stand in for current weather, so the page fetches instead.
+    city, country = DEFAULT_CITY
+    if API_KEY != "demo_key":
+        initial = cached_real_weather(city, country)
+    else:
+        initial = lookup_weather(city, country)
+
+    return render_template(
+        "index.html",
+        popular_cities=popular_cities,
+        api_status=api_status,
+        demo_cities_count=len(DEMO_DATA),
+        default_city=city,
+        default_country=country,
+        initial_weather=initial.to_dict() if initial else None,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _find_demo_key(city, country=""):
+    """Resolve a (lowercased) query to a DEMO_DATA key, or None"""
+    search_key = f"{city},{country}" if country else city
+    for key in DEMO_DATA:
+        if search_key in key or city in key:
+            return key
+    return None
+
+
+def lookup_weather(city, country=""):
+    """Return the Observation for a city, or None if it is unknown"""
+    if API_KEY != "demo_key":
+        observation = fetch_real_weather(city, country)
+        if observation:
+            return observation
+
+    # Fall back to demo data
+    key = _find_demo_key(city.lower(), country.lower())
+    return DEMO_OBSERVATIONS[key] if key else None
+
+
+class HistoryLog:
+    """Append-only columnar log of observations, partitioned by UTC day.
+
+    Each partition directory (YYYY-MM-DD) holds one fixed-width binary file
+    per column. The partition name is the time index: a range query opens
+    only the days it overlaps and memory-maps them one at a time, so memory
+    use is bounded by a single day of data however long the log grows.
+    """
+
+    # (column, struct/numpy type code)
+    COLUMNS = (
+        ("ts", "<q"),
+        ("city", "<I"),
+        ("country", "<I"),
+        ("temperature", "<f"),
+        ("humidity", "<f"),
+        ("pressure", "<f"),
+        ("wind_speed", "<f"),
+    )
+    METRICS = ("temperature", "humidity", "pressure", "wind_speed")
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def series_id(name):
+        """Stable 32-bit id for a city or country name"""
+        return zlib.crc32(name.strip().lower().encode())
+
+    def _partition(self, day):
+        return os.path.join(
+            self.root, time.strftime("%Y-%m-%d", time.gmtime(day * 86400))
+        )
 
-    return render_template_string(
+    def _partitions(self, first_day, last_day):
+        """Yield existing partition paths for days in [first_day, last_day]"""
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        days = []
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                day = calendar.timegm(time.strptime(entry.name, "%Y-%m-%d")) // 86400
+            except ValueError:
+                continue
+            if first_day <= day <= last_day:
+                days.append((day, entry.path))
+        for _, path in sorted(days):
+            yield path
+
+    def append(self, observation):
+        """Append one Observation to the partition for its timestamp.
+
+        Skipped if the city's last row in the partition has the same
+        timestamp, i.e. the same upstream reading was already logged by a
+        refetch or another worker process.
         """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🌤️ Global Weather App</title>
-    <style>
-        * {
-            margin: 0; padding: 0; box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh; color: #333; padding: 20px;
-        }
-        
-        .container { max-width: 800px; margin: 0 auto; }
-        
-        .header {
-            text-align: center; margin-bottom: 30px;
-        }
-        
-        .header h1 {
-            color: white; font-size: 2.5rem;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3); margin-bottom: 10px;
-        }
-        
-        .api-status {
-            background: rgba(255,255,255,0.2); color: white; padding: 8px 16px;
-            border-radius: 20px; font-size: 0.9rem; margin-bottom: 20px;
-        }
-        
-        .search-section {
-            background: white; padding: 30px; border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2); margin-bottom: 30px;
-        }
-        
-        .form-row {
-            display: flex; gap: 15px; margin-bottom: 20px;
-        }
-        
-        .form-group {
-            flex: 1;
-        }
-        
-        label {
-            display: block; margin-bottom: 8px; font-weight: bold; color: #333;
-        }
-        
-        input[type="text"] {
-            width: 100%; padding: 12px; border: 2px solid #e0e0e0;
-            border-radius: 8px; font-size: 16px; transition: border-color 0.3s;
-        }
-        
-        input[type="text"]:focus {
-            outline: none; border-color: #667eea;
-        }
-        
-        .search-btn {
-            width: 100%; padding: 15px; background: #667eea; color: white;
-            border: none; border-radius: 8px; font-size: 16px; font-weight: bold;
-            cursor: pointer; transition: background 0.3s;
-        }
-        
-        .search-btn:hover { background: #5a67d8; }
-        
-        .popular-cities {
-            margin-top: 20px;
-        }
-        
-        .popular-cities h3 {
-            margin-bottom: 15px; color: #333; text-align: center;
-        }
-        
-        .cities-grid {
-            display: grid; grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
-            gap: 10px; max-height: 200px; overflow-y: auto;
-        }
-        
-        .city-btn {
-            background: #f8f9fa; border: 1px solid #ddd; padding: 8px 12px;
-            border-radius: 6px; cursor: pointer; font-size: 12px;
-            transition: all 0.3s; text-align: center;
-        }
-        
-        .city-btn:hover {
-            background: #e9ecef; transform: translateY(-2px);
-        }
-        
-        .weather-container {
-            background: white; border-radius: 15px;
-            box-shadow: 0 15px 40px rgba(0,0,0,0.2); overflow: hidden;
-            min-height: 300px; display: flex; align-items: center; justify-content: center;
-        }
-        
-        .loading {
-            text-align: center; color: #666; font-size: 18px;
-        }
-        
-        .weather-info {
-            padding: 30px; width: 100%; display: none;
-        }
-        
-        .weather-info.active { display: block; }
-        
-        .location {
-            text-align: center; margin-bottom: 25px;
-        }
-        
-        .location h2 {
-            font-size: 2rem; color: #333; margin-bottom: 5px;
-        }
-        
-        .location p {
-            color: #666; font-size: 1.1rem;
-        }
-        
-        .current-weather {
-            text-align: center; margin-bottom: 30px; padding: 20px;
-            background: linear-gradient(135deg, #f8f9fa, #e9ecef); border-radius: 15px;
-        }
-        
-        .weather-icon { font-size: 4rem; margin-bottom: 10px; }
-        .temperature { font-size: 3rem; font-weight: bold; color: #667eea; margin-bottom: 10px; }
-        .description { font-size: 1.3rem; font-weight: bold; color: #333; text-transform: capitalize; margin-bottom: 5px; }
-        .feels-like { color: #666; font-size: 1rem; }
-        
-        .weather-stats {
-            display: grid; grid-template-columns: repeat(auto-fit, minmax(140px, 1fr)); gap: 15px;
+        ts = int(observation.observed_at)
+        row = {
+            "ts": ts,
+            "city": self.series_id(observation.city),
+            "country": self.series_id(observation.country_code),
+            "temperature": observation.temperature_c,
+            "humidity": observation.humidity,
+            "pressure": observation.pressure,
+            "wind_speed": observation.wind_speed_ms,
         }
-        
-        .stat {
-            background: linear-gradient(135deg, #f8f9fa, #e9ecef); padding: 15px;
-            border-radius: 10px; text-align: center; transition: transform 0.3s ease;
-        }
-        
-        .stat:hover { transform: translateY(-5px); }
-        .stat-icon { font-size: 1.5rem; margin-bottom: 5px; }
-        .stat-label { font-size: 0.9rem; color: #666; margin-bottom: 5px; }
-        .stat-value { font-weight: bold; color: #333; }
-        
-        .error-message {
-            text-align: center; color: #e74c3c; display: none; padding: 30px;
-        }
-        
-        .error-message.active { display: block; }
-        
-        .timestamp {
-            text-align: center; color: #999; font-size: 0.9rem; margin-top: 20px;
-        }
-        
-        .info-box {
-            background: rgba(255,255,255,0.1); color: white; padding: 15px;
-            border-radius: 10px; margin-bottom: 20px; text-align: center;
-        }
-        
-        @media (max-width: 768px) {
-            .form-row { flex-direction: column; }
-            .cities-grid { grid-template-columns: repeat(3, 1fr); }
-            .weather-stats { grid-template-columns: repeat(2, 1fr); }
+        path = self._partition(ts // 86400)
+        with self._lock:
+            os.makedirs(path, exist_ok=True)
+            # The file lock keeps columns aligned across worker processes
+            with open(os.path.join(path, ".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                sizes = self._align(path)
+                if self._last_ts(path, row["city"], row["country"]) == ts:
+                    return
+                try:
+                    for name, code in self.COLUMNS:
+                        with open(os.path.join(path, name), "ab") as column:
+                            column.write(struct.pack(code, row[name]))
+                except OSError:
+                    # Roll back the partial row so the columns stay aligned
+                    for name, _ in self.COLUMNS:
+                        column_path = os.path.join(path, name)
+                        if os.path.exists(column_path):
+                            os.truncate(column_path, sizes[name])
+                    raise
+
+    def _last_ts(self, path, city_id, country_id):
+        """Timestamp of a city's last row in an aligned partition, or None"""
+        columns = self._load(path)
+        if columns is None:
+            return None
+        np = _numpy()
+        matches = np.flatnonzero(
+            (columns["city"] == city_id) & (columns["country"] == country_id)
+        )
+        return int(columns["ts"][matches[-1]]) if len(matches) else None
+
+    def _align(self, path):
+        """Trim every column to the shortest one's row count.
+
+        Repairs a row left half-written by a crash. Returns the aligned
+        size in bytes of each column.
+        """
+        rows = None
+        for name, code in self.COLUMNS:
+            try:
+                size = os.path.getsize(os.path.join(path, name))
+            except FileNotFoundError:
+                size = 0
+            count = size // struct.calcsize(code)
+            rows = count if rows is None else min(rows, count)
+        sizes = {}
+        for name, code in self.COLUMNS:
+            sizes[name] = rows * struct.calcsize(code)
+            column_path = os.path.join(path, name)
+            if (
+                os.path.exists(column_path)
+                and os.path.getsize(column_path) != sizes[name]
+            ):
+                os.truncate(column_path, sizes[name])
+        return sizes
+
+    def _load(self, path):
+        """Memory-map a partition's columns, trimmed to complete rows"""
+        np = _numpy()
+        sizes = []
+        for name, code in self.COLUMNS:
+            try:
+                size = os.path.getsize(os.path.join(path, name))
+            except OSError:
+                return None
+            sizes.append(size // struct.calcsize(code))
+        rows = min(sizes)
+        if not rows:
+            return None
+        return {
+            name: np.memmap(
+                os.path.join(path, name), np.dtype(code), "r", shape=(rows,)
+            )
+            for name, code in self.COLUMNS
         }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🌤️ Global Weather App</h1>
-            <div class="api-status">Status: {{ api_status }}</div>
-        </div>
-        
-        {% if api_status == "Demo Mode" %}
-        <div class="info-box">
-            <strong>Demo Mode:</strong> Showing {{ demo_cities_count }} popular cities. 
-            <br>For unlimited cities, add your OpenWeatherMap API key!
-        </div>
-        {% endif %}
-        
-        <div class="search-section">
-            <form id="weatherForm">
-                <div class="form-row">
-                    <div class="form-group">
-                        <label for="city">City:</label>
-                        <input type="text" id="city" name="city" placeholder="Enter city name..." required>
-                    </div>
-                    <div class="form-group">
-                        <label for="country">Country (optional):</label>
-                        <input type="text" id="country" name="country" placeholder="Country code (e.g., US, FR, MA)">
-                    </div>
-                </div>
-                <button type="submit" class="search-btn">🔍 Get Weather</button>
-            </form>
-            
-            <div class="popular-cities">
-                <h3>Popular Cities ({{ demo_cities_count }} available):</h3>
-                <div class="cities-grid">
-                    {% for city, country in popular_cities %}
-                    <button class="city-btn" onclick="searchDemo('{{ city }}', '{{ country }}')">
-                        {{ city }}, {{ country }}
-                    </button>
-                    {% endfor %}
-                </div>
-            </div>
-        </div>
-        
-        <div class="weather-container" id="weatherContainer">
-            <div class="loading" id="loading">
-                <div>🌍</div>
-                <div>Enter a city to see weather data</div>
-            </div>
-            
-            <div class="weather-info" id="weatherInfo">
-                <div class="location">
-                    <h2 id="cityName"></h2>
-                    <p id="countryName"></p>
-                </div>
-                
-                <div class="current-weather">
-                    <div class="weather-icon" id="weatherIcon"></div>
-                    <div class="temperature" id="temperature"></div>
-                    <div class="description" id="description"></div>
-                    <div class="feels-like" id="feelsLike"></div>
-                </div>
-                
-                <div class="weather-stats">
-                    <div class="stat">
-                        <div class="stat-icon">💧</div>
-                        <div class="stat-label">Humidity</div>
-                        <div class="stat-value" id="humidity"></div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-icon">🌪️</div>
-                        <div class="stat-label">Wind</div>
-                        <div class="stat-value" id="windSpeed"></div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-icon">🔽</div>
-                        <div class="stat-label">Pressure</div>
-                        <div class="stat-value" id="pressure"></div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-icon">👁️</div>
-                        <div class="stat-label">Visibility</div>
-                        <div class="stat-value" id="visibility"></div>
-                    </div>
-                </div>
-                
-                <div class="timestamp" id="timestamp"></div>
-            </div>
-            
-            <div class="error-message" id="errorMessage">
-                <div>❌</div>
-                <div>City not found. Try one of the popular cities above.</div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        // DOM elements
-        const form = document.getElementById('weatherForm');
-        const cityInput = document.getElementById('city');
-        const countryInput = document.getElementById('country');
-        const loading = document.getElementById('loading');
-        const weatherInfo = document.getElementById('weatherInfo');
-        const errorMessage = document.getElementById('errorMessage');
-
-        // Form handler
-        form.addEventListener('submit', async (e) => {
-            e.preventDefault();
-            const city = cityInput.value.trim();
-            const country = countryInput.value.trim();
-            
-            if (!city) {
-                alert('Please enter a city name');
-                return;
+
+    def query(self, city, country, start, end, buckets):
+        """Downsample [start, end) into min/max/avg buckets for one city"""
+        np = _numpy()
+        step = max(1, -(-(end - start) // buckets))
+        size = -(-(end - start) // step)
+        counts = np.zeros(size, np.int64)
+        sums = {m: np.zeros(size) for m in self.METRICS}
+        lows = {m: np.full(size, np.inf) for m in self.METRICS}
+        highs = {m: np.full(size, -np.inf) for m in self.METRICS}
+        city_id = self.series_id(city)
+        country_id = self.series_id(country) if country else None
+
+        for path in self._partitions(start // 86400, (end - 1) // 86400):
+            columns = self._load(path)
+            if columns is None:
+                continue
+            ts = columns["ts"]
+            mask = (ts >= start) & (ts < end) & (columns["city"] == city_id)
+            if country_id is not None:
+                mask &= columns["country"] == country_id
+            if not mask.any():
+                continue
+            index = (ts[mask] - start) // step
+            counts += np.bincount(index, minlength=size)
+            for metric in self.METRICS:
+                values = columns[metric][mask].astype(np.float64)
+                sums[metric] += np.bincount(index, weights=values, minlength=size)
+                np.minimum.at(lows[metric], index, values)
+                np.maximum.at(highs[metric], index, values)
+
+        result = []
+        for i in np.flatnonzero(counts).tolist():
+            bucket_start = start + i * step
+            bucket = {
+                "ts": bucket_start,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(bucket_start)),
+                "count": int(counts[i]),
             }
-            
-            await searchWeather(city, country);
-        });
-
-        // Search weather function
-        async function searchWeather(city, country = '') {
-            showLoading();
-            
-            try {
-                const params = new URLSearchParams({ city, country });
-                const response = await fetch(`/api/weather?${params}`);
-                const data = await response.json();
-                
-                if (response.ok) {
-                    displayWeather(data);
-                } else {
-                    showError(data.error);
+            for metric in self.METRICS:
+                bucket[metric] = {
+                    "min": round(float(lows[metric][i]), 1),
+                    "max": round(float(highs[metric][i]), 1),
+                    "avg": round(float(sums[metric][i] / counts[i]), 1),
                 }
-            } catch (error) {
-                showError('Connection error');
-            }
-        }
+            result.append(bucket)
+        return step, result
 
-        // Demo city search
-        function searchDemo(city, country) {
-            cityInput.value = city;
-            countryInput.value = country;
-            searchWeather(city, country);
-        }
 
-        // Display weather data
-        function displayWeather(data) {
-            document.getElementById('cityName').textContent = data.city;
-            document.getElementById('countryName').textContent = data.country;
-            document.getElementById('weatherIcon').textContent = data.icon;
-            document.getElementById('temperature').textContent = `${data.temperature}°C`;
-            document.getElementById('description').textContent = data.description;
-            document.getElementById('feelsLike').textContent = `Feels like: ${data.feels_like}°C`;
-            document.getElementById('humidity').textContent = `${data.humidity}%`;
-            document.getElementById('windSpeed').textContent = `${data.wind_speed} m/s`;
-            document.getElementById('pressure').textContent = `${data.pressure} hPa`;
-            document.getElementById('visibility').textContent = `${data.visibility} km`;
-            document.getElementById('timestamp').textContent = `Updated: ${data.timestamp}`;
-            
-            showWeatherInfo();
-        }
+HISTORY = HistoryLog(HISTORY_DIR) if HISTORY_DIR else None
 
-        // Show loading
-        function showLoading() {
-            loading.style.display = 'block';
-            weatherInfo.classList.remove('active');
-            errorMessage.classList.remove('active');
-        }
 
-        // Show weather info
-        function showWeatherInfo() {
-            loading.style.display = 'none';
-            weatherInfo.classList.add('active');
-            errorMessage.classList.remove('active');
-        }
+def record_history(observation):
+    """Log an upstream observation, if the history log is enabled"""
+    if HISTORY is None:
+        return
+    try:
+        HISTORY.append(observation)
+    except OSError:
+        app.logger.exception("Could not write observation history")
 
-        // Show error
-        function showError(message) {
-            loading.style.display = 'none';
-            weatherInfo.classList.remove('active');
-            errorMessage.classList.add('active');
-            errorMessage.querySelector('div:last-child').textContent = message;
-        }
 
-        // Load default city
-        window.addEventListener('load', () => {
-            searchDemo('London', 'GB');
-        });
-    </script>
-</body>
-</html>
-    """,
-        popular_cities=popular_cities,
-        api_status=api_status,
-        demo_cities_count=len(DEMO_DATA),
-    )
+def _parse_time(value, default):
+    """Parse epoch seconds or an ISO 8601 datetime (UTC if naive).
+
+    Raises ValueError for unparsable, non-finite or out-of-range values.
+    """
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        seconds = parsed.timestamp()
+    if not 0 <= seconds <= MAX_TIMESTAMP:
+        raise ValueError(f"time out of range: {value}")
+    return int(seconds)
 
 
 @app.route("/api/weather")
@@ -672,56 +726,402 @@ def get_weather():
     """API endpoint for weather data"""
     city = request.args.get("city", "").strip()
     country = request.args.get("country", "").strip()
+    units = request.args.get("units", "metric").strip().lower()
+    lang = request.args.get("lang", "en").strip().lower()
 
     if not city:
         return jsonify({"error": "City required"}), 400
+    if units not in UNITS:
+        return jsonify({"error": f"units must be one of: {', '.join(UNITS)}"}), 400
+    if lang not in LANGUAGES:
+        return jsonify({"error": f"lang must be one of: {', '.join(LANGUAGES)}"}), 400
+
+    # One canonical (metric) observation per city serves every variant
+    observation = lookup_weather(city, country)
+    if not observation:
+        return jsonify({"error": f'City "{city}" not found in demo data'}), 404
+
+    return app.response_class(
+        observation.to_json(units=units, lang=lang), mimetype="application/json"
+    )
+
+
+class ForecastSeries:
+    """3-hourly forecast for one city, stored as typed arrays.
+
+    ts holds UTC epoch seconds (int64); temperature (°C) and precipitation
+    (mm per step, rain plus snow) are float32 arrays of the same length.
+    """
+
+    __slots__ = ("city", "country", "tz_offset", "ts", "temperature", "precipitation")
+
+    def __init__(self, city, country, tz_offset, ts, temperature, precipitation):
+        self.city = city
+        self.country = country
+        self.tz_offset = tz_offset
+        self.ts = ts
+        self.temperature = temperature
+        self.precipitation = precipitation
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a series from an OpenWeatherMap /forecast response"""
+        np = _numpy()
+        items = data["list"]
+        count = len(items)
+        ts = np.fromiter((item["dt"] for item in items), np.int64, count)
+        temperature = np.fromiter(
+            (item["main"]["temp"] for item in items), np.float32, count
+        )
+        precipitation = np.fromiter(
+            (
+                item.get("rain", {}).get("3h", 0.0)
+                + item.get("snow", {}).get("3h", 0.0)
+                for item in items
+            ),
+            np.float32,
+            count,
+        )
+        city = data["city"]
+        return cls(
+            city["name"],
+            city["country"],
+            city.get("timezone", 0),
+            ts,
+            temperature,
+            precipitation,
+        )
+
+    @classmethod
+    def from_demo(cls, key):
+        """Derive a deterministic stub forecast from a DEMO_DATA entry"""
+        np = _numpy()
+        data = DEMO_DATA[key]
+        start = int(time.time()) // FORECAST_STEP * FORECAST_STEP
+        ts = start + np.arange(FORECAST_STEPS, dtype=np.int64) * FORECAST_STEP
+        hours = (ts % 86400) / 3600.0
+        # Per-city phase so demo cities do not all trend the same way
+        phase = zlib.crc32(key.encode()) % 360 * np.pi / 180
+        days = (ts - start) / 86400.0
+        temperature = (
+            data["main"]["temp"]
+            + 4.0 * np.sin(2 * np.pi * (hours - 9) / 24)
+            + 2.0 * np.sin(2 * np.pi * days / FORECAST_DAYS + phase)
+        ).astype(np.float32)
+        wet = data["weather"][0]["main"] in ("Rain", "Drizzle", "Thunderstorm", "Snow")
+        precipitation = np.clip(
+            np.sin(2 * np.pi * days / 2 + phase) * (1.5 if wet else 0.4), 0, None
+        ).astype(np.float32)
+        return cls(data["name"], data["country"], 0, ts, temperature, precipitation)
+
+
+def cached_real_forecast(city, country=""):
+    """Return a fresh cached ForecastSeries without any network call"""
+    query = f"{city},{country}" if country else city
+    cached = _forecast_cache.get(query.lower())
+    if cached and time.time() - cached[0] < CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def forecast_needs_fetch(city, country=""):
+    """True if fetch_real_forecast would make an upstream HTTP call"""
+    if API_KEY == "demo_key" or _breaker_open():
+        return False
+    if cached_real_forecast(city, country):
+        return False
+    query = f"{city},{country}" if country else city
+    missed = _forecast_misses.get(query.lower())
+    return not (missed and time.time() - missed[0] < FORECAST_MISS_TTL)
+
+
+def fetch_real_forecast(city, country=""):
+    """Fetch the 5 day / 3 hour forecast from OpenWeatherMap"""
+    if API_KEY == "demo_key":
+        return None
+
+    query = f"{city},{country}" if country else city
+    cache_key = query.lower()
+    cached = cached_real_forecast(city, country)
+    if cached:
+        return cached
+
+    if not forecast_needs_fetch(city, country):
+        return None
+
+    http = _http()
+    try:
+        params = {"q": query, "appid": API_KEY, "units": "metric"}
+
+        response = http.get(FORECAST_URL, params=params, timeout=10)
+        if response.status_code == 200:
+            series = ForecastSeries.from_api(response.json())
+        else:
+            _record_upstream_result(response.status_code == 404)
+            _cache_store(_forecast_misses, cache_key, True)
+            return None
+    except (http.RequestException, ValueError, KeyError, TypeError):
+        _record_upstream_result(False)
+        _cache_store(_forecast_misses, cache_key, True)
+        return None
+
+    _record_upstream_result(True)
+    _cache_store(_forecast_cache, cache_key, series)
+    return series
+
 
-    # Try real API first if available
+def lookup_forecast(city, country=""):
+    """Return the ForecastSeries for a city, or None if it is unknown"""
     if API_KEY != "demo_key":
-        real_data = fetch_real_weather(city, country)
-        if real_data:
-            weather_data = {
-                "city": real_data["name"],
-                "country": real_data["sys"]["country"],
-                "temperature": round(real_data["main"]["temp"]),
-                "feels_like": round(real_data["main"]["feels_like"]),
-                "description": real_data["weather"][0]["description"],
-                "icon": get_weather_icon(real_data["weather"][0]["icon"]),
-                "humidity": real_data["main"]["humidity"],
-                "wind_speed": real_data["wind"]["speed"],
-                "pressure": real_data["main"]["pressure"],
-                "visibility": round(real_data["visibility"] / 1000, 1),
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        series = fetch_real_forecast(city, country)
+        if series:
+            return series
+
+    key = _find_demo_key(city.lower(), country.lower())
+    if not key:
+        return None
+    cache_key = f"demo:{key}"
+    cached = _forecast_cache.get(cache_key)
+    if cached and time.time() - cached[0] < CACHE_TTL:
+        return cached[1]
+    series = ForecastSeries.from_demo(key)
+    _cache_store(_forecast_cache, cache_key, series)
+    return series
+
+
+def summarize_forecasts(series_list, days=FORECAST_DAYS):
+    """Aggregate forecasts into daily min/max/mean temperature and precipitation.
+
+    All cities are concatenated into flat arrays and reduced per (city, local
+    day) group with numpy, so the work is vectorized over every timestep;
+    Python only loops over the resulting daily rows.
+    """
+    np = _numpy()
+    summaries = [
+        {"city": series.city, "country": series.country, "days": []}
+        for series in series_list
+    ]
+    lengths = [len(series.ts) for series in series_list]
+    if not sum(lengths):
+        return summaries
+
+    local_ts = np.concatenate([series.ts + series.tz_offset for series in series_list])
+    temperature = np.concatenate([series.temperature for series in series_list])
+    precipitation = np.concatenate([series.precipitation for series in series_list])
+    city_index = np.repeat(np.arange(len(series_list)), lengths)
+    day = local_ts // 86400
+
+    # Series are time ordered, so each (city, day) group is a contiguous run
+    boundary = np.ones(len(day), dtype=bool)
+    boundary[1:] = (city_index[1:] != city_index[:-1]) | (day[1:] != day[:-1])
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, len(day)))
+
+    group_city = city_index[starts]
+    # Position of each day within its city, to keep only the first `days`
+    rank = np.arange(len(starts)) - np.searchsorted(group_city, group_city)
+    keep = rank < days
+
+    # Widen before rounding so float32 noise does not leak into the JSON
+    temp_min = np.minimum.reduceat(temperature, starts)[keep].astype(np.float64)
+    temp_max = np.maximum.reduceat(temperature, starts)[keep].astype(np.float64)
+    temp_mean = (np.add.reduceat(temperature, starts, dtype=np.float64) / counts)[keep]
+    precip = np.add.reduceat(precipitation, starts, dtype=np.float64)[keep]
+    dates = day[starts][keep].astype("datetime64[D]").astype(str)
+
+    rows = zip(
+        group_city[keep].tolist(),
+        dates.tolist(),
+        np.round(temp_min, 1).tolist(),
+        np.round(temp_max, 1).tolist(),
+        np.round(temp_mean, 1).tolist(),
+        np.round(precip, 1).tolist(),
+    )
+    for index, date, low, high, mean, rain in rows:
+        summaries[index]["days"].append(
+            {
+                "date": date,
+                "temp_min": low,
+                "temp_max": high,
+                "temp_mean": mean,
+                "precipitation": rain,
             }
-            return jsonify(weather_data)
+        )
+    return summaries
 
-    # Fall back to demo data
-    search_key = f"{city.lower()},{country.lower()}" if country else city.lower()
 
-    data = None
-    for key, value in DEMO_DATA.items():
-        if search_key in key or city.lower() in key:
-            data = value
-            break
+@app.route("/api/forecast")
+def get_forecast():
+    """API endpoint for daily forecast summaries.
+
+    Either ?city=London&country=GB for one city, or
+    ?cities=London,GB;Paris,FR to summarize several cities at once. A
+    multi-city request makes at most MAX_FORECAST_FETCHES upstream calls;
+    other uncached cities are listed under "pending" to be retried later.
+    """
+    days = request.args.get("days", FORECAST_DAYS, type=int)
+    days = max(1, min(days, FORECAST_DAYS))
+
+    if "cities" in request.args:
+        queries = []
+        for item in request.args["cities"].split(";"):
+            city, _, country = item.partition(",")
+            if city.strip():
+                queries.append((city.strip(), country.strip()))
+        if not queries:
+            return jsonify({"error": "City required"}), 400
+        if len(queries) > MAX_FORECAST_CITIES:
+            return (
+                jsonify({"error": f"At most {MAX_FORECAST_CITIES} cities allowed"}),
+                400,
+            )
 
-    if not data:
+        found, not_found, pending = [], [], []
+        fetches = 0
+        for city, country in queries:
+            # Only real upstream calls count against the per-request budget
+            if forecast_needs_fetch(city, country):
+                if fetches >= MAX_FORECAST_FETCHES:
+                    pending.append(city)
+                    continue
+                fetches += 1
+            series = lookup_forecast(city, country)
+            if series:
+                found.append(series)
+            else:
+                not_found.append(city)
+        return jsonify(
+            {
+                "forecasts": summarize_forecasts(found, days),
+                "not_found": not_found,
+                "pending": pending,
+            }
+        )
+
+    city = request.args.get("city", "").strip()
+    country = request.args.get("country", "").strip()
+
+    if not city:
+        return jsonify({"error": "City required"}), 400
+
+    series = lookup_forecast(city, country)
+    if not series:
         return jsonify({"error": f'City "{city}" not found in demo data'}), 404
 
-    weather_data = {
-        "city": data["name"],
-        "country": data["country"],
-        "temperature": round(data["main"]["temp"]),
-        "feels_like": round(data["main"]["feels_like"]),
-        "description": data["weather"][0]["description"],
-        "icon": get_weather_icon(data["weather"][0]["icon"]),
-        "humidity": data["main"]["humidity"],
-        "wind_speed": data["wind"]["speed"],
-        "pressure": data["main"]["pressure"],
-        "visibility": round(data["visibility"] / 1000, 1),
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-    }
+    return jsonify(summarize_forecasts([series], days)[0])
+
+
+@app.route("/api/history")
+def get_history():
+    """API endpoint for downsampled historical observations.
+
+    ?city=London&country=GB&start=...&end=...&buckets=100, where start and
+    end are epoch seconds or ISO 8601 (default: the last 7 days).
+    """
+    if HISTORY is None:
+        return jsonify({"error": "History log is disabled"}), 404
+
+    city = request.args.get("city", "").strip()
+    country = request.args.get("country", "").strip()
 
-    return jsonify(weather_data)
+    if not city:
+        return jsonify({"error": "City required"}), 400
+
+    try:
+        end = _parse_time(request.args.get("end"), int(time.time()) + 1)
+        start = _parse_time(request.args.get("start"), end - HISTORY_DEFAULT_RANGE)
+    except ValueError:
+        return jsonify({"error": "Invalid start or end time"}), 400
+    # Nothing can be logged beyond the near future, so clamp the range there
+    end = min(end, int(time.time()) + 86400)
+    if start >= end:
+        return jsonify({"error": "start must be before end"}), 400
+
+    buckets = request.args.get("buckets", 100, type=int)
+    buckets = max(1, min(buckets, MAX_HISTORY_BUCKETS))
+
+    step, result = HISTORY.query(city, country, start, end, buckets)
+    return jsonify(
+        {
+            "city": city,
+            "country": country,
+            "start": start,
+            "end": end,
+            "step": step,
+            "buckets": result,
+        }
+    )
+
+
+def _catalogue():
+    """Yield every known Observation: cached real ones first, then demo cities.
+
+    Cached observations past CACHE_TTL are left out, as in
+    cached_real_weather, and demo cities that also have a fresh cached real
+    observation are skipped. Only the cache (bounded by CACHE_MAX_ENTRIES)
+    is snapshotted; demo entries are iterated in place.
+    """
+    now = time.time()
+    with _state_lock:
+        cached = [
+            observation
+            for stored_at, observation in _observation_cache.values()
+            if now - stored_at < CACHE_TTL
+        ]
+    seen = set()
+    for observation in cached:
+        key = (observation.city.lower(), observation.country_code.lower())
+        if key not in seen:
+            seen.add(key)
+            yield "api", observation
+    for key, observation in DEMO_OBSERVATIONS.items():
+        if (observation.city.lower(), observation.country_code.lower()) not in seen:
+            yield "demo", observation
+
+
+@app.route("/api/export")
+def export_weather():
+    """Stream current conditions for every known city as NDJSON.
+
+    Optional filters: ?country=GB (code or name), ?region=Europe and
+    ?since=<epoch or ISO 8601> to return only observations newer than that.
+    """
+    country = request.args.get("country", "").strip().lower()
+    region = request.args.get("region", "").strip().lower()
+    try:
+        since = _parse_time(request.args.get("since"), None)
+    except ValueError:
+        return jsonify({"error": "Invalid since time"}), 400
+
+    def generate():
+        # The request is torn down before streaming starts, so the stream
+        # counts itself as in flight for the readiness probe
+        _add_in_flight(1)
+        try:
+            for source, observation in _catalogue():
+                if country and country not in (
+                    observation.country_code.lower(),
+                    observation.country.lower(),
+                ):
+                    continue
+                if region and region != (observation.region or "").lower():
+                    continue
+                if since is not None and observation.observed_at <= since:
+                    continue
+                record = observation.to_dict(
+                    datetime.fromtimestamp(observation.observed_at).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    )
+                )
+                record["country_code"] = observation.country_code
+                record["region"] = observation.region
+                record["observed_at"] = observation.observed_at
+                record["source"] = source
+                yield dumps_json(record) + b"\n"
+        finally:
+            _add_in_flight(-1)
+
+    return app.response_class(generate(), mimetype="application/x-ndjson")
 
 
 @app.route("/health")
@@ -736,7 +1136,67 @@ def health_check():
     )
 
 
+@app.route("/health/live")
+def liveness_check():
+    """Liveness probe: constant time, only proves the process is serving."""
+    return jsonify({"status": "alive"})
+
+
+@app.route("/health/ready")
+def readiness_check():
+    """Readiness probe built from precomputed serving state.
+
+    No network calls are made here; upstream reachability comes from the
+    circuit breaker that the request path keeps up to date.
+    """
+    now = time.time()
+    with _state_lock:
+        in_flight = _in_flight
+        failures = _upstream_state["consecutive_failures"]
+        last_success = _upstream_state["last_success"]
+        breaker_open = _breaker_open(now)
+        cache_entries = len(_observation_cache)
+
+    saturated = in_flight >= MAX_IN_FLIGHT
+    real_api = API_KEY != "demo_key"
+    if not real_api:
+        upstream = "disabled"
+    elif breaker_open:
+        upstream = "unavailable"
+    elif failures:
+        upstream = "degraded"
+    else:
+        upstream = "ok"
+
+    body = {
+        "status": "saturated" if saturated else "ready",
+        "service": "weather-app",
+        "upstream": {
+            "status": upstream,
+            "breaker": "open" if breaker_open else "closed",
+            "consecutive_failures": failures,
+            "last_success": last_success,
+        },
+        "cache": {
+            "entries": cache_entries,
+            "warm": cache_entries > 0 or not real_api,
+            "demo_cities": len(DEMO_DATA),
+        },
+        "workers": {"in_flight": in_flight, "max_in_flight": MAX_IN_FLIGHT},
+    }
+    # Upstream outages are survivable (demo fallback), saturation is not
+    return jsonify(body), 503 if saturated else 200
+
+
+def prebuild_artifacts():
+    """Compile the page template into TEMPLATE_CACHE_DIR ahead of time"""
+    app.jinja_env.get_template("index.html")
+
+
 if __name__ == "__main__":
+    if "--prebuild" in sys.argv:
+        prebuild_artifacts()
+        sys.exit(0)
     print("🌤️ Starting Enhanced Weather App...")
     print(f"📱 Open your browser at: http://localhost:5000")
     print(f"🗄️ Demo cities available: {len(DEMO_DATA)}")